@@ -4,7 +4,7 @@ Async/Await Patterns Example
 This example demonstrates various async patterns with BrainUs AI.
 
 Requirements:
-    pip install brainus-ai
+    pip install "brainus-ai[http2]"
 
 Usage:
     export BRAINUS_API_KEY=your_api_key
@@ -13,75 +13,104 @@ Usage:
 
 import asyncio
 from brainus_ai import BrainusAI
+import httpx
 import os
-from typing import List, Dict
+import sys
+from typing import List, Dict, Optional
 
 
-async def query_single(query: str, store_id: str = "default") -> Dict:
+# Read once at import so a missing key fails fast instead of on the first query
+API_KEY = os.environ.get("BRAINUS_API_KEY") or sys.exit(
+    "Error: BRAINUS_API_KEY environment variable not set"
+)
+
+# Keep enough pooled connections alive for the concurrent queries below
+POOL_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=200, keepalive_expiry=30)
+
+
+def _to_record(query: str, result) -> Dict:
+    """Convert a QueryResponse into the result dict returned by the helpers below"""
+    citations = result.citations
+    return {
+        'query': query,
+        'answer': result.answer,
+        'citations_count': len(citations) if citations else 0
+    }
+
+
+async def query_single(query: str, store_id: str = "default", *, client: BrainusAI) -> Dict:
     """
     Query a single question
     
     Args:
         query: The question to ask
         store_id: The store ID to query
+        client: Shared BrainusAI client (reuses its connection pool)
         
     Returns:
         Dict with query and result
     """
-    async with BrainusAI(api_key=os.getenv("BRAINUS_API_KEY")) as client:
-        result = await client.query(query=query, store_id=store_id)
-        return {
-            'query': query,
-            'answer': result.answer,
-            'citations_count': len(result.citations) if result.citations else 0
-        }
+    result = await client.query(query=query, store_id=store_id)
+    return _to_record(query, result)
 
 
-async def query_multiple(queries: List[str], store_id: str = "default") -> List[Dict]:
+async def query_multiple(
+    queries: List[str], store_id: str = "default", *, client: BrainusAI
+) -> List[Dict]:
     """
     Query multiple questions in parallel
     
     This is much faster than querying sequentially because all
-    requests are made concurrently.
+    requests are made concurrently. Duplicate questions are only
+    sent once.
     
     Args:
         queries: List of questions to ask
         store_id: The store ID to query
+        client: Shared BrainusAI client (reuses its connection pool)
         
     Returns:
         List of results
     """
-    async with BrainusAI(api_key=os.getenv("BRAINUS_API_KEY")) as client:
-        tasks = [
-            client.query(query=q, store_id=store_id)
-            for q in queries
-        ]
-        results = await asyncio.gather(*tasks)
+    async def query_one(q: str):
+        return q, await client.query(query=q, store_id=store_id)
+
+    # Map each distinct question to every position it appears at
+    positions: Dict[str, List[int]] = {}
+    for i, q in enumerate(queries):
+        positions.setdefault(q, []).append(i)
+
+    tasks = [asyncio.create_task(query_one(q)) for q in positions]
+    results = [None] * len(queries)
+    try:
+        # Handle responses as they arrive instead of holding them all until the slowest one
+        for next_done in asyncio.as_completed(tasks):
+            q, r = await next_done
+            for i in positions[q]:
+                results[i] = _to_record(q, r)
+    finally:
+        # If one query fails, don't leave the rest running
+        for task in tasks:
+            task.cancel()
     
-    return [
-        {
-            'query': q,
-            'answer': r.answer,
-            'citations_count': len(r.citations) if r.citations else 0
-        }
-        for q, r in zip(queries, results)
-    ]
+    return results
 
 
-async def query_with_timeout(query: str, timeout: float = 10.0) -> Dict:
+async def query_with_timeout(query: str, timeout: float = 10.0, *, client: BrainusAI) -> Dict:
     """
     Query with a timeout
     
     Args:
         query: The question to ask
         timeout: Maximum seconds to wait
+        client: Shared BrainusAI client (reuses its connection pool)
         
     Returns:
         Dict with result or error
     """
     try:
         result = await asyncio.wait_for(
-            query_single(query),
+            query_single(query, client=client),
             timeout=timeout
         )
         return result
@@ -92,36 +121,73 @@ async def query_with_timeout(query: str, timeout: float = 10.0) -> Dict:
         }
 
 
-async def query_with_fallback(query: str, fallback_stores: List[str]) -> Dict:
+async def query_with_fallback(
+    query: str,
+    fallback_stores: List[str],
+    hedge_delay: Optional[float] = None,
+    *,
+    client: BrainusAI
+) -> Dict:
     """
     Query with fallback to alternative stores
     
+    Stores are raced rather than tried one after another, so the answer
+    arrives as fast as the quickest healthy store. The remaining requests
+    are cancelled as soon as one succeeds.
+    
+    With ``hedge_delay`` set, stores are started one at a time in order:
+    the next one only starts if nothing has answered within ``hedge_delay``
+    seconds, or straight away when a request fails. This keeps the extra
+    load low when the first store is usually fine.
+    
     Args:
         query: The question to ask
-        fallback_stores: List of store IDs to try in order
+        fallback_stores: List of store IDs, in order of preference
+        hedge_delay: Seconds to wait before starting the next store
+            (None starts all stores at once)
+        client: Shared BrainusAI client (reuses its connection pool)
         
     Returns:
         Result from first successful store
     """
-    async with BrainusAI(api_key=os.getenv("BRAINUS_API_KEY")) as client:
-        for store_id in fallback_stores:
-            try:
-                result = await client.query(query=query, store_id=store_id)
+    remaining = list(fallback_stores)
+    tasks: Dict[asyncio.Task, str] = {}
+    try:
+        while remaining or tasks:
+            launch = len(remaining) if hedge_delay is None else 1
+            for store_id in remaining[:launch]:
+                tasks[asyncio.create_task(client.query(query=query, store_id=store_id))] = store_id
+            del remaining[:launch]
+
+            done, _ = await asyncio.wait(
+                tasks,
+                timeout=hedge_delay if remaining else None,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            # Prefer the earlier store if several finished together
+            for task in sorted(done, key=lambda t: fallback_stores.index(tasks[t])):
+                store_id = tasks.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    print(f"Failed with {store_id}: {e}")
+                    continue
                 return {
                     'query': query,
                     'answer': result.answer,
                     'store_used': store_id,
                     'success': True
                 }
-            except Exception as e:
-                print(f"Failed with {store_id}: {e}")
-                continue
-        
-        return {
-            'query': query,
-            'error': 'All stores failed',
-            'success': False
-        }
+    finally:
+        # Cancel the requests that lost the race
+        for task in tasks:
+            task.cancel()
+    
+    return {
+        'query': query,
+        'error': 'All stores failed',
+        'success': False
+    }
 
 
 async def main():
@@ -131,47 +197,58 @@ async def main():
     print("ASYNC PATTERNS DEMONSTRATION")
     print("=" * 60)
     
-    # Example 1: Single query
-    print("\n1. Single Query:")
-    result = await query_single("What is photosynthesis?")
-    print(f"   Q: {result['query']}")
-    print(f"   A: {result['answer'][:100]}...")
-    
-    # Example 2: Multiple queries in parallel
-    print("\n2. Multiple Parallel Queries:")
-    queries = [
-        "What is photosynthesis?",
-        "Explain the water cycle",
-        "What causes earthquakes?"
-    ]
-    results = await query_multiple(queries)
-    for r in results:
-        print(f"   Q: {r['query']}")
-        print(f"   A: {r['answer'][:80]}...")
-        print()
-    
-    # Example 3: Query with timeout
-    print("\n3. Query with Timeout:")
-    result = await query_with_timeout("What is machine learning?", timeout=10.0)
-    if 'error' in result:
-        print(f"   Error: {result['error']}")
-    else:
-        print(f"   Q: {result['query']}")
-        print(f"   A: {result['answer'][:100]}...")
-    
-    # Example 4: Query with fallback stores
-    print("\n4. Query with Fallback Stores:")
-    result = await query_with_fallback(
-        "What is quantum computing?",
-        fallback_stores=["primary", "secondary", "default"]
-    )
-    if result['success']:
+    # One client for the whole demo so every query shares the same connection pool.
+    # HTTP/2 multiplexes the concurrent queries over a single connection.
+    async with BrainusAI(api_key=API_KEY, http2=True, limits=POOL_LIMITS) as client:
+        # Example 1: Single query
+        print("\n1. Single Query:")
+        result = await query_single("What is photosynthesis?", client=client)
         print(f"   Q: {result['query']}")
-        print(f"   Store: {result['store_used']}")
         print(f"   A: {result['answer'][:100]}...")
-    else:
-        print(f"   Error: {result['error']}")
+        
+        # Example 2: Multiple queries in parallel
+        print("\n2. Multiple Parallel Queries:")
+        queries = [
+            "What is photosynthesis?",
+            "Explain the water cycle",
+            "What causes earthquakes?"
+        ]
+        results = await query_multiple(queries, client=client)
+        for r in results:
+            print(f"   Q: {r['query']}")
+            print(f"   A: {r['answer'][:80]}...")
+            print()
+        
+        # Example 3: Query with timeout
+        print("\n3. Query with Timeout:")
+        result = await query_with_timeout("What is machine learning?", timeout=10.0, client=client)
+        if 'error' in result:
+            print(f"   Error: {result['error']}")
+        else:
+            print(f"   Q: {result['query']}")
+            print(f"   A: {result['answer'][:100]}...")
+        
+        # Example 4: Query with fallback stores
+        print("\n4. Query with Fallback Stores:")
+        result = await query_with_fallback(
+            "What is quantum computing?",
+            fallback_stores=["primary", "secondary", "default"],
+            client=client
+        )
+        if result['success']:
+            print(f"   Q: {result['query']}")
+            print(f"   Store: {result['store_used']}")
+            print(f"   A: {result['answer'][:100]}...")
+        else:
+            print(f"   Error: {result['error']}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop is a faster drop-in event loop; fall back to asyncio where it
+    # isn't installed (it isn't available on Windows)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -66,7 +66,14 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop is a faster drop-in event loop; fall back to asyncio where it
+    # isn't installed (it isn't available on Windows)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
 
 
 
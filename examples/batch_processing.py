@@ -5,7 +5,7 @@ This example demonstrates processing large batches of queries with
 rate limiting, error handling, and progress tracking.
 
 Requirements:
-    pip install brainus-ai pandas
+    pip install "brainus-ai[http2]" pyarrow aiolimiter tqdm
 
 Usage:
     export BRAINUS_API_KEY=your_api_key
@@ -13,71 +13,148 @@ Usage:
 """
 
 from brainus_ai import BrainusAI
-import pandas as pd
-from typing import List, Dict
+import httpx
+from aiolimiter import AsyncLimiter
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from tqdm.asyncio import tqdm
+from typing import List, Dict, Optional
 import asyncio
 import os
-from datetime import datetime
+import sys
+import time
+
+
+# Read once at import so a missing key fails fast instead of on the first query
+API_KEY = os.environ.get("BRAINUS_API_KEY") or sys.exit(
+    "Error: BRAINUS_API_KEY environment variable not set"
+)
+
+# Keep enough pooled connections alive for the concurrent queries below
+POOL_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=200, keepalive_expiry=30)
+
+# Columns written by process_csv_file ahead of the input CSV's own columns
+RESULT_FIELDS = [
+    pa.field('query', pa.string()),
+    pa.field('answer', pa.string()),
+    pa.field('error', pa.string()),
+    pa.field('citations_count', pa.int32()),
+    pa.field('success', pa.bool_()),
+]
+
+
+def _to_record(query: str, result) -> Dict:
+    """Convert a QueryResponse (or the Exception a query raised) into a result dict"""
+    if isinstance(result, Exception):
+        return {
+            'query': query,
+            'answer': None,
+            'error': str(result),
+            'citations_count': 0,
+            'success': False
+        }
+    citations = result.citations
+    return {
+        'query': query,
+        'answer': result.answer,
+        'error': None,
+        'citations_count': len(citations) if citations else 0,
+        'success': True
+    }
+
+
+async def _iter_queries(
+    queries: List[str],
+    batch_size: int,
+    store_id: str,
+    max_rate: float,
+    *,
+    client: BrainusAI
+):
+    """
+    Run queries concurrently and yield each result as soon as it completes
+    
+    Duplicate queries are only sent once; their shared result is yielded
+    for every position they appear at.
+    
+    Yields:
+        ``(index, QueryResponse or Exception)`` tuples in completion order
+    """
+    semaphore = asyncio.Semaphore(batch_size)
+    limiter = AsyncLimiter(max_rate, 1.0)
+
+    async def query_one(query: str):
+        async with semaphore, limiter:
+            try:
+                return query, await client.query(query=query, store_id=store_id)
+            except Exception as e:
+                return query, e
+
+    positions: Dict[str, List[int]] = {}
+    for index, query in enumerate(queries):
+        positions.setdefault(query, []).append(index)
+
+    tasks = [asyncio.create_task(query_one(q)) for q in positions]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            query, result = await next_done
+            for index in positions[query]:
+                yield index, result
+    finally:
+        # Don't leave requests running if the consumer stops early
+        for task in tasks:
+            task.cancel()
+
+
+def _results_table(
+    queries: List[str], results: list, extra: pa.Table, schema: pa.Schema
+) -> pa.Table:
+    """Build an output table for a run of rows from raw query results"""
+    records = [_to_record(q, r) for q, r in zip(queries, results, strict=True)]
+    arrays = [
+        pa.array([record[field.name] for record in records], type=field.type)
+        for field in RESULT_FIELDS
+    ]
+    return pa.Table.from_arrays(arrays + extra.columns, schema=schema)
 
 
 async def process_batch(
     queries: List[str], 
     batch_size: int = 10,
     store_id: str = "default",
-    rate_limit_delay: float = 1.0
+    max_rate: float = 10.0,
+    *,
+    client: BrainusAI
 ) -> List[Dict]:
     """
-    Process queries in batches with rate limiting
+    Process queries concurrently with rate limiting
+    
+    Up to ``batch_size`` requests are in flight at any time and a new one
+    starts as soon as a slot frees up, so a slow query never stalls the
+    rest of the batch. The limiter spaces requests out to ``max_rate``
+    per second.
     
     Args:
         queries: List of query strings
-        batch_size: Number of queries to process at once
+        batch_size: Maximum number of concurrent requests
         store_id: Store ID to query
-        rate_limit_delay: Seconds to wait between batches
+        max_rate: Maximum requests per second
+        client: Shared BrainusAI client (reuses its connection pool)
         
     Returns:
         List of result dictionaries
     """
-    results = []
-    total_batches = (len(queries) + batch_size - 1) // batch_size
-
-    async with BrainusAI(api_key=os.getenv("BRAINUS_API_KEY")) as client:
-        for batch_num, i in enumerate(range(0, len(queries), batch_size), 1):
-            batch = queries[i:i + batch_size]
-            
-            print(f"Processing batch {batch_num}/{total_batches} ({len(batch)} queries)...")
-
-            # Create tasks for the batch
-            tasks = [
-                client.query(query=q, store_id=store_id)
-                for q in batch
-            ]
-
-            # Execute batch with error handling
-            batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Process results
-            for query, result in zip(batch, batch_results):
-                if isinstance(result, Exception):
-                    results.append({
-                        'query': query,
-                        'answer': None,
-                        'error': str(result),
-                        'citations_count': 0,
-                        'success': False
-                    })
-                else:
-                    results.append({
-                        'query': query,
-                        'answer': result.answer,
-                        'error': None,
-                        'citations_count': len(result.citations) if result.citations else 0,
-                        'success': True
-                    })
-
-            # Rate limiting: wait between batches
-            if i + batch_size < len(queries):
-                await asyncio.sleep(rate_limit_delay)
+    print(
+        f"Processing {len(queries)} queries ({len(set(queries))} unique, "
+        f"{batch_size} concurrent, {max_rate:g} req/s)..."
+    )
+
+    # Convert each response as it completes so it can be freed right away
+    results: List[Optional[Dict]] = [None] * len(queries)
+    async for index, result in _iter_queries(
+        queries, batch_size, store_id, max_rate, client=client
+    ):
+        results[index] = _to_record(queries[index], result)
 
     return results
 
@@ -86,47 +163,69 @@ async def process_csv_file(
     input_file: str,
     output_file: str,
     query_column: str = 'query',
-    batch_size: int = 10
+    batch_size: int = 10,
+    max_rate: float = 10.0,
+    *,
+    client: BrainusAI
 ):
     """
     Process queries from a CSV file
     
+    The CSV is parsed and written by PyArrow's multithreaded C++ engine, and
+    the input's other columns are carried over as zero-copy slices, so file
+    handling stays negligible next to the API calls even for large inputs.
+    
     Args:
         input_file: Path to input CSV with queries
         output_file: Path to save results CSV
         query_column: Name of column containing queries
-        batch_size: Batch size for processing
+        batch_size: Maximum number of concurrent requests
+        max_rate: Maximum requests per second
+        client: Shared BrainusAI client (reuses its connection pool)
     """
     print(f"\nReading queries from {input_file}...")
-    df = pd.read_csv(input_file)
+    # Read the query column as text even if its values look numeric, boolean
+    # or date-like; PyArrow would otherwise infer a non-string type for it
+    table = pacsv.read_csv(
+        input_file,
+        convert_options=pacsv.ConvertOptions(column_types={query_column: pa.string()}),
+    )
     
-    if query_column not in df.columns:
+    if query_column not in table.column_names:
         raise ValueError(f"Column '{query_column}' not found in CSV")
     
-    queries = df[query_column].tolist()
+    queries = table.column(query_column).to_pylist()
+    extra = table.drop_columns([query_column])
+    schema = pa.schema(RESULT_FIELDS + list(extra.schema))
     print(f"Found {len(queries)} queries")
     
-    print(f"\nProcessing in batches of {batch_size}...")
-    start_time = datetime.now()
+    print(f"\nProcessing with up to {batch_size} concurrent requests...")
+    start_ns = time.monotonic_ns()
     
-    results = await process_batch(queries, batch_size=batch_size)
+    # Results arrive out of order; write each contiguous run of finished rows
+    # as soon as it is available so output keeps input order without holding
+    # every result in memory until the end.
+    finished = {}
+    flushed = ready = 0
+    success_count = 0
+    with pacsv.CSVWriter(output_file, schema) as writer:
+        async for index, result in _iter_queries(
+            queries, batch_size, "default", max_rate, client=client
+        ):
+            finished[index] = result
+            while ready in finished:
+                ready += 1
+            if ready - flushed >= batch_size or (ready == len(queries) and ready > flushed):
+                results = [finished.pop(k) for k in range(flushed, ready)]
+                success_count += sum(1 for r in results if not isinstance(r, Exception))
+                writer.write_table(_results_table(
+                    queries[flushed:ready], results, extra.slice(flushed, ready - flushed), schema
+                ))
+                flushed = ready
     
-    end_time = datetime.now()
-    duration = (end_time - start_time).total_seconds()
-    
-    # Create results DataFrame
-    results_df = pd.DataFrame(results)
-    
-    # Add original data
-    for col in df.columns:
-        if col != query_column:
-            results_df[col] = df[col]
-    
-    # Save results
-    results_df.to_csv(output_file, index=False)
+    duration = (time.monotonic_ns() - start_ns) / 1e9
     
     # Print statistics
-    success_count = results_df['success'].sum()
     print(f"\n{'='*60}")
     print(f"BATCH PROCESSING COMPLETE")
     print(f"{'='*60}")
@@ -138,44 +237,39 @@ async def process_csv_file(
     print(f"Results saved to: {output_file}")
 
 
-async def process_with_progress(queries: List[str]) -> List[Dict]:
+async def process_with_progress(
+    queries: List[str], max_rate: float = 10.0, *, client: BrainusAI
+) -> List[Dict]:
     """
-    Process queries with detailed progress tracking
+    Process queries with a progress bar
+    
+    All queries are started at once and paced by a token-bucket limiter,
+    so throughput follows ``max_rate`` instead of a fixed delay per query.
     
     Args:
         queries: List of query strings
+        max_rate: Maximum requests per second
+        client: Shared BrainusAI client (reuses its connection pool)
         
     Returns:
         List of results
     """
-    results = []
-    
-    async with BrainusAI(api_key=os.getenv("BRAINUS_API_KEY")) as client:
-        for i, query in enumerate(queries, 1):
-            try:
-                print(f"[{i}/{len(queries)}] Processing: {query[:50]}...")
-                result = await client.query(query=query, store_id="default")
-                
-                results.append({
-                    'query': query,
-                    'answer': result.answer,
-                    'citations_count': len(result.citations) if result.citations else 0,
-                    'success': True
-                })
-                print(f"  ✓ Success ({len(result.answer)} chars)")
-                
-            except Exception as e:
-                results.append({
-                    'query': query,
-                    'error': str(e),
-                    'success': False
-                })
-                print(f"  ✗ Error: {e}")
-            
-            # Small delay between requests
-            if i < len(queries):
-                await asyncio.sleep(0.5)
-    
+    limiter = AsyncLimiter(max_rate, 1.0)
+
+    async def query_one(index: int, query: str):
+        try:
+            async with limiter:
+                return index, _to_record(query, await client.query(query=query, store_id="default"))
+        except Exception as e:
+            return index, _to_record(query, e)
+
+    # Fill a preallocated list by index as results arrive (no append/sort pass)
+    results: List[Optional[Dict]] = [None] * len(queries)
+    tasks = [asyncio.create_task(query_one(i, q)) for i, q in enumerate(queries)]
+    for next_done in tqdm.as_completed(tasks, total=len(tasks), desc="Processing"):
+        index, record = await next_done
+        results[index] = record
+
     return results
 
 
@@ -198,9 +292,17 @@ async def main():
         "How does the internet work?",
     ]
     
-    # Process with progress tracking
-    print("\nProcessing queries with progress tracking:")
-    results = await process_with_progress(sample_queries[:3])
+    # One client for the whole demo so every query shares the same connection pool.
+    # HTTP/2 multiplexes the concurrent queries over a single connection.
+    async with BrainusAI(api_key=API_KEY, http2=True, limits=POOL_LIMITS) as client:
+        # Process with progress tracking
+        print("\nProcessing queries with progress tracking:")
+        results = await process_with_progress(sample_queries[:3], client=client)
+        
+        # Process in batches
+        print("\n" + "=" * 60)
+        print("Processing in batches:")
+        batch_results = await process_batch(sample_queries, batch_size=3, client=client)
     
     print(f"\nResults:")
     for r in results:
@@ -209,11 +311,6 @@ async def main():
         else:
             print(f"  ✗ {r['query'][:40]}... -> Error: {r['error']}")
     
-    # Process in batches
-    print("\n" + "=" * 60)
-    print("Processing in batches:")
-    batch_results = await process_batch(sample_queries, batch_size=3)
-    
     success_count = sum(1 for r in batch_results if r['success'])
     print(f"\nBatch Summary:")
     print(f"  Total: {len(batch_results)}")
@@ -221,9 +318,8 @@ async def main():
     print(f"  Failed: {len(batch_results) - success_count}")
     
     # Save to CSV (optional)
-    df = pd.DataFrame(batch_results)
     output_file = "batch_results.csv"
-    df.to_csv(output_file, index=False)
+    pacsv.write_csv(pa.Table.from_pylist(batch_results), output_file)
     print(f"\n  Results saved to: {output_file}")
 
 
@@ -232,7 +328,7 @@ async def main():
 """
 async def example_csv():
     # Create sample input CSV
-    sample_df = pd.DataFrame({
+    sample_table = pa.table({
         'id': range(1, 11),
         'query': [
             "What is photosynthesis?",
@@ -247,19 +343,28 @@ async def example_csv():
             "Explain quantum computing"
         ]
     })
-    sample_df.to_csv('queries.csv', index=False)
+    pacsv.write_csv(sample_table, 'queries.csv')
     
     # Process the CSV
-    await process_csv_file(
-        input_file='queries.csv',
-        output_file='results.csv',
-        query_column='query',
-        batch_size=3
-    )
+    async with BrainusAI(api_key=API_KEY, http2=True, limits=POOL_LIMITS) as client:
+        await process_csv_file(
+            input_file='queries.csv',
+            output_file='results.csv',
+            query_column='query',
+            batch_size=3,
+            client=client
+        )
 
 # asyncio.run(example_csv())
 """
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop is a faster drop-in event loop; fall back to asyncio where it
+    # isn't installed (it isn't available on Windows)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -5,20 +5,62 @@ This example shows how to integrate BrainUs API with Django REST Framework.
 Django 3.1+ supports async views.
 
 Requirements:
-    pip install djangorestframework brainus-ai
+    pip install djangorestframework brainus-ai orjson xxhash cachetools
 
 Setup:
     Add to settings.py:
     BRAINUS_API_KEY = os.getenv('BRAINUS_API_KEY')
+
+    To use the orjson renderer for every view, also add:
+    REST_FRAMEWORK = {
+        'DEFAULT_RENDERER_CLASSES': ['yourapp.views.ORJSONRenderer'],
+    }
 """
 
+from rest_framework.renderers import BaseRenderer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from brainus_ai import BrainusAI, BrainusError
 from django.conf import settings
 from django.core.cache import cache
-import hashlib
+import asyncio
+import cachetools
+import orjson
+import random
+import threading
+import xxhash
+
+
+# Upstream fetches in flight, keyed by event loop and cache key. Concurrent
+# requests for the same uncached query await one shared task instead of each
+# calling the API. A task can only be awaited from its own loop, so under
+# ASGI (one loop per worker) requests coalesce, while under WSGI, where each
+# async view gets its own loop, every request simply fetches for itself.
+_inflight: dict[tuple[asyncio.AbstractEventLoop, str], asyncio.Task] = {}
+
+# Short-lived in-process cache (L1) in front of the Django cache backend (L2),
+# so hot queries are answered without a round-trip to Redis/memcached.
+# TTLCache is not thread-safe, and under WSGI async views run on separate
+# loops in separate threads, so every access holds the lock.
+_local_cache = cachetools.TTLCache(maxsize=10_000, ttl=60)
+_local_cache_lock = threading.Lock()
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    JSON renderer backed by orjson, which is much faster than the
+    stdlib json encoder DRF uses by default.
+    """
+
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data)
 
 
 class QueryView(APIView):
@@ -31,6 +73,8 @@ class QueryView(APIView):
         "store_id": "default"
     }
     """
+
+    renderer_classes = [ORJSONRenderer]
     
     async def post(self, request):
         query = request.data.get('query')
@@ -42,31 +86,39 @@ class QueryView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Cache key based on query
-        cache_key = f"brainus_{hashlib.md5(query.encode()).hexdigest()}"
+        # Cache key based on query (xxh3 is a fast non-cryptographic hash)
+        cache_key = f"brainus_{xxhash.xxh3_64_hexdigest(query.encode())}"
 
-        # Check cache first
-        cached_result = await cache.aget(cache_key)
+        # Check the in-process cache first, then the shared cache
+        with _local_cache_lock:
+            cached_result = _local_cache.get(cache_key)
         if cached_result:
             return Response({
                 'answer': cached_result,
                 'cached': True
-            })
+            }, headers={'X-Cache': 'L1-HIT'})
 
-        try:
-            # Make API request
-            async with BrainusAI(api_key=settings.BRAINUS_API_KEY) as client:
-                result = await client.query(query=query, store_id=store_id)
+        cached_result = await cache.aget(cache_key)
+        if cached_result:
+            with _local_cache_lock:
+                _local_cache[cache_key] = cached_result
+            return Response({
+                'answer': cached_result,
+                'cached': True
+            }, headers={'X-Cache': 'L2-HIT'})
 
-            # Cache for 1 hour
-            await cache.aset(cache_key, result.answer, 3600)
+        loop = asyncio.get_running_loop()
+        inflight_key = (loop, cache_key)
+        task = _inflight.get(inflight_key)
+        if task is None:
+            task = loop.create_task(self._fetch(cache_key, query, store_id))
+            _inflight[inflight_key] = task
+            task.add_done_callback(lambda _: _inflight.pop(inflight_key, None))
 
-            return Response({
-                'answer': result.answer,
-                'citations': result.citations,
-                'has_citations': result.has_citations,
-                'cached': False
-            })
+        try:
+            # shield() so a disconnecting client cancels only its own wait,
+            # not the fetch other requests are waiting on
+            return Response(await asyncio.shield(task), headers={'X-Cache': 'MISS'})
 
         except BrainusError as e:
             return Response(
@@ -75,6 +127,26 @@ class QueryView(APIView):
             )
 
 
+    @staticmethod
+    async def _fetch(cache_key, query, store_id):
+        # Make API request
+        async with BrainusAI(api_key=settings.BRAINUS_API_KEY) as client:
+            result = await client.query(query=query, store_id=store_id)
+
+        # Cache for about 1 hour; the jitter keeps entries written together
+        # from all expiring at the same moment
+        await cache.aset(cache_key, result.answer, 3600 + random.randint(-300, 300))
+        with _local_cache_lock:
+            _local_cache[cache_key] = result.answer
+
+        return {
+            'answer': result.answer,
+            'citations': [c.model_dump() for c in result.citations],
+            'has_citations': result.has_citations,
+            'cached': False
+        }
+
+
 # URL Configuration (urls.py)
 """
 from django.urls import path
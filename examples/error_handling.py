@@ -4,7 +4,7 @@ Error Handling Example
 This example demonstrates comprehensive error handling patterns for BrainUs AI.
 
 Requirements:
-    pip install brainus-ai
+    pip install brainus-ai aiolimiter tenacity tqdm
 
 Usage:
     export BRAINUS_API_KEY=your_api_key
@@ -19,132 +19,184 @@ from brainus_ai import (
     QuotaExceededError,
     APIError
 )
+from aiolimiter import AsyncLimiter
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+from tqdm.asyncio import tqdm
 import asyncio
 import os
+import sys
 from typing import Optional
 
 
-async def basic_error_handling(query: str) -> Optional[dict]:
+# Read once at import so a missing key fails fast instead of on the first query
+API_KEY = os.environ.get("BRAINUS_API_KEY") or sys.exit(
+    "Error: BRAINUS_API_KEY environment variable not set"
+)
+
+
+async def basic_error_handling(query: str, *, client: BrainusAI) -> Optional[dict]:
     """
     Basic error handling with try-except
     
     Args:
         query: The question to ask
+        client: Shared BrainusAI client (reuses its connection pool)
         
     Returns:
         Result dict or None on error
     """
     try:
-        async with BrainusAI(api_key=os.getenv("BRAINUS_API_KEY")) as client:
-            result = await client.query(query=query, store_id="default")
-            return {
-                'answer': result.answer,
-                'success': True
-            }
+        result = await client.query(query=query, store_id="default")
+        return {
+            'answer': result.answer,
+            'success': True
+        }
     except BrainusError as e:
         print(f"Error: {e}")
         return None
 
 
-async def robust_query(query: str, max_retries: int = 3) -> Optional[dict]:
+def retrying(max_retries: int = 3) -> AsyncRetrying:
+    """
+    Retry policy shared by the helpers below
+    
+    Rate limits and API errors are retried with full-jitter exponential
+    backoff (a random wait of up to 2**attempt seconds, capped at 30s), so
+    clients that failed at the same moment don't all retry in lockstep.
+    A rate limit's Retry-After is honoured as the minimum wait, under the
+    same cap. Any other error, or the last failure, is re-raised to the
+    caller.
+    
+    Args:
+        max_retries: Maximum number of attempts
+    """
+    return AsyncRetrying(
+        retry=retry_if_exception_type((APIError, RateLimitError)),
+        wait=wait_retry_after,
+        stop=stop_after_attempt(max_retries),
+        before_sleep=log_retry,
+        reraise=True,
+    )
+
+
+backoff = wait_random_exponential(multiplier=1, max=30)
+
+
+def wait_retry_after(retry_state: RetryCallState) -> float:
+    """Jittered backoff, but never sooner than the server's Retry-After"""
+    error = retry_state.outcome.exception()
+    retry_after = error.retry_after if isinstance(error, RateLimitError) else None
+    return min(max(retry_after or 0, backoff(retry_state)), 30)
+
+
+def log_retry(retry_state: RetryCallState) -> None:
+    """Report a failed attempt before tenacity sleeps and retries"""
+    error = retry_state.outcome.exception()
+    icon = "⏳" if isinstance(error, RateLimitError) else "⚠️ "
+    delay = retry_state.next_action.sleep
+    tqdm.write(
+        f"{icon} {type(error).__name__}: {error}. "
+        f"Retrying in {delay:.1f}s... (attempt {retry_state.attempt_number})"
+    )
+
+
+async def robust_query(query: str, max_retries: int = 3, *, client: BrainusAI) -> Optional[dict]:
     """
     Query with comprehensive error handling and retry logic
     
     Args:
         query: The question to ask
         max_retries: Maximum retry attempts for recoverable errors
+        client: Shared BrainusAI client (reuses its connection pool)
         
     Returns:
         Result dict or None on permanent failure
     """
-    async with BrainusAI(api_key=os.getenv("BRAINUS_API_KEY")) as client:
-        for attempt in range(max_retries):
-            try:
+    try:
+        async for attempt in retrying(max_retries):
+            with attempt:
                 result = await client.query(query=query, store_id="default")
-                return {
-                    'answer': result.answer,
-                    'citations': result.citations,
-                    'has_citations': result.has_citations,
-                    'success': True,
-                    'attempts': attempt + 1
-                }
-
-            except AuthenticationError as e:
-                # Permanent error - no retry
-                print(f"❌ Authentication failed: {e}")
-                print("Check your API key!")
-                return {
-                    'error': 'authentication_failed',
-                    'message': str(e),
-                    'success': False
-                }
-
-            except RateLimitError as e:
-                # Recoverable - wait and retry
-                print(f"⏳ Rate limited. Waiting {e.retry_after}s...")
-                await asyncio.sleep(e.retry_after)
-                continue
-
-            except QuotaExceededError as e:
-                # Permanent error - no retry
-                print(f"❌ Quota exceeded: {e}")
-                print("Consider upgrading your plan!")
-                return {
-                    'error': 'quota_exceeded',
-                    'message': str(e),
-                    'success': False
-                }
-
-            except APIError as e:
-                # Potentially recoverable - retry with backoff
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt  # Exponential backoff
-                    print(f"⚠️  API error. Retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries})")
-                    await asyncio.sleep(wait_time)
-                    continue
-                else:
-                    print(f"❌ API error after {max_retries} attempts: {e}")
-                    return {
-                        'error': 'api_error',
-                        'message': str(e),
-                        'success': False
-                    }
-
-            except BrainusError as e:
-                # Generic error
-                print(f"❌ Unexpected error: {e}")
-                return {
-                    'error': 'unexpected_error',
-                    'message': str(e),
-                    'success': False
-                }
+        return {
+            'answer': result.answer,
+            'citations': result.citations,
+            'has_citations': result.has_citations,
+            'success': True,
+            'attempts': attempt.retry_state.attempt_number
+        }
 
-    return {
-        'error': 'max_retries_exceeded',
-        'message': f'Failed after {max_retries} attempts',
-        'success': False
-    }
+    except AuthenticationError as e:
+        # Permanent error - no retry
+        print(f"❌ Authentication failed: {e}")
+        print("Check your API key!")
+        return {
+            'error': 'authentication_failed',
+            'message': str(e),
+            'success': False
+        }
+
+    except RateLimitError:
+        # Still rate limited after every retry
+        return {
+            'error': 'max_retries_exceeded',
+            'message': f'Failed after {max_retries} attempts',
+            'success': False
+        }
+
+    except QuotaExceededError as e:
+        # Permanent error - no retry
+        print(f"❌ Quota exceeded: {e}")
+        print("Consider upgrading your plan!")
+        return {
+            'error': 'quota_exceeded',
+            'message': str(e),
+            'success': False
+        }
+
+    except APIError as e:
+        print(f"❌ API error after {max_retries} attempts: {e}")
+        return {
+            'error': 'api_error',
+            'message': str(e),
+            'success': False
+        }
+
+    except BrainusError as e:
+        # Generic error
+        print(f"❌ Unexpected error: {e}")
+        return {
+            'error': 'unexpected_error',
+            'message': str(e),
+            'success': False
+        }
 
 
-async def query_with_fallback(query: str, fallback_answer: str = "Unable to process query") -> dict:
+async def query_with_fallback(
+    query: str, fallback_answer: str = "Unable to process query", *, client: BrainusAI
+) -> dict:
     """
     Query with a fallback answer on error
     
     Args:
         query: The question to ask
         fallback_answer: Default answer if query fails
+        client: Shared BrainusAI client (reuses its connection pool)
         
     Returns:
         Result dict with answer (from API or fallback)
     """
     try:
-        async with BrainusAI(api_key=os.getenv("BRAINUS_API_KEY")) as client:
-            result = await client.query(query=query, store_id="default")
-            return {
-                'answer': result.answer,
-                'source': 'api',
-                'success': True
-            }
+        result = await client.query(query=query, store_id="default")
+        return {
+            'answer': result.answer,
+            'source': 'api',
+            'success': True
+        }
     except Exception as e:
         print(f"⚠️  Query failed, using fallback: {e}")
         return {
@@ -155,12 +207,13 @@ async def query_with_fallback(query: str, fallback_answer: str = "Unable to proc
         }
 
 
-async def validate_and_query(query: str) -> Optional[dict]:
+async def validate_and_query(query: str, *, client: BrainusAI) -> Optional[dict]:
     """
     Validate input before querying
     
     Args:
         query: The question to ask
+        client: Shared BrainusAI client (reuses its connection pool)
         
     Returns:
         Result dict or None if validation fails
@@ -184,12 +237,11 @@ async def validate_and_query(query: str) -> Optional[dict]:
     
     # Query with error handling
     try:
-        async with BrainusAI(api_key=os.getenv("BRAINUS_API_KEY")) as client:
-            result = await client.query(query=query, store_id="default")
-            return {
-                'answer': result.answer,
-                'success': True
-            }
+        result = await client.query(query=query, store_id="default")
+        return {
+            'answer': result.answer,
+            'success': True
+        }
     except BrainusError as e:
         return {
             'error': 'api_error',
@@ -198,63 +250,65 @@ async def validate_and_query(query: str) -> Optional[dict]:
         }
 
 
-async def batch_with_error_handling(queries: list[str]) -> list[dict]:
+def _to_record(query: str, result) -> dict:
+    """Convert a QueryResponse (or the Exception a query raised) into a result dict"""
+    if isinstance(result, Exception):
+        return {
+            'query': query,
+            'answer': None,
+            'error': str(result),
+            'citations_count': 0,
+            'success': False
+        }
+    citations = result.citations
+    return {
+        'query': query,
+        'answer': result.answer,
+        'error': None,
+        'citations_count': len(citations) if citations else 0,
+        'success': True
+    }
+
+
+async def batch_with_error_handling(
+    queries: list[str], max_rate: float = 10.0, *, client: BrainusAI
+) -> list[dict]:
     """
     Process multiple queries with individual error handling
     
+    Queries run concurrently behind a token-bucket limiter; a failure in
+    one query never affects the others.
+    
     Args:
         queries: List of questions
+        max_rate: Maximum requests per second
+        client: Shared BrainusAI client (reuses its connection pool)
         
     Returns:
         List of results (successes and failures)
     """
-    results = []
-    
-    async with BrainusAI(api_key=os.getenv("BRAINUS_API_KEY")) as client:
-        for i, query in enumerate(queries, 1):
-            print(f"\n[{i}/{len(queries)}] Processing: {query[:50]}...")
-            
-            try:
-                result = await client.query(query=query, store_id="default")
-                results.append({
-                    'query': query,
-                    'answer': result.answer,
-                    'success': True
-                })
-                print(f"  ✓ Success")
-                
-            except RateLimitError as e:
-                print(f"  ⏳ Rate limited, waiting {e.retry_after}s...")
-                await asyncio.sleep(e.retry_after)
-                # Retry once
-                try:
-                    result = await client.query(query=query, store_id="default")
-                    results.append({
-                        'query': query,
-                        'answer': result.answer,
-                        'success': True
-                    })
-                    print(f"  ✓ Success (after retry)")
-                except Exception as retry_error:
-                    results.append({
-                        'query': query,
-                        'error': str(retry_error),
-                        'success': False
-                    })
-                    print(f"  ✗ Failed after retry: {retry_error}")
-                    
-            except Exception as e:
-                results.append({
-                    'query': query,
-                    'error': str(e),
-                    'success': False
-                })
-                print(f"  ✗ Error: {e}")
-            
-            # Small delay between queries
-            if i < len(queries):
-                await asyncio.sleep(0.5)
-    
+    limiter = AsyncLimiter(max_rate, 1.0)
+
+    async def query_one(index: int, query: str):
+        try:
+            # Retry once on rate limits and API errors
+            async for attempt in retrying(max_retries=2):
+                with attempt:
+                    async with limiter:
+                        result = await client.query(query=query, store_id="default")
+            return index, _to_record(query, result)
+
+        except Exception as e:
+            tqdm.write(f"  ✗ Error: {e}")
+            return index, _to_record(query, e)
+
+    # Fill a preallocated list by index as results arrive (no append/sort pass)
+    results: list[Optional[dict]] = [None] * len(queries)
+    tasks = [asyncio.create_task(query_one(i, q)) for i, q in enumerate(queries)]
+    for next_done in tqdm.as_completed(tasks, total=len(tasks), desc="Processing"):
+        index, record = await next_done
+        results[index] = record
+
     return results
 
 
@@ -265,51 +319,60 @@ async def main():
     print("ERROR HANDLING DEMONSTRATION")
     print("=" * 60)
     
-    # Example 1: Basic error handling
-    print("\n1. Basic Error Handling:")
-    result = await basic_error_handling("What is photosynthesis?")
-    if result:
-        print(f"   ✓ Success: {result['answer'][:80]}...")
+    try:
+        client = BrainusAI(api_key=API_KEY)
+    except AuthenticationError as e:
+        print(f"❌ Could not create client: {e}")
+        return
     
-    # Example 2: Robust query with retries
-    print("\n2. Robust Query with Retry Logic:")
-    result = await robust_query("Explain the water cycle")
-    if result and result['success']:
-        print(f"   ✓ Success (attempts: {result['attempts']})")
+    # One client for the whole demo so every query shares the same connection pool
+    async with client:
+        # Example 1: Basic error handling
+        print("\n1. Basic Error Handling:")
+        result = await basic_error_handling("What is photosynthesis?", client=client)
+        if result:
+            print(f"   ✓ Success: {result['answer'][:80]}...")
+        
+        # Example 2: Robust query with retries
+        print("\n2. Robust Query with Retry Logic:")
+        result = await robust_query("Explain the water cycle", client=client)
+        if result and result['success']:
+            print(f"   ✓ Success (attempts: {result['attempts']})")
+            print(f"   Answer: {result['answer'][:80]}...")
+        else:
+            print(f"   ✗ Failed: {result['error']}")
+        
+        # Example 3: Query with fallback
+        print("\n3. Query with Fallback:")
+        result = await query_with_fallback(
+            "What is quantum computing?",
+            fallback_answer="Quantum computing is a complex topic.",
+            client=client
+        )
+        print(f"   Source: {result['source']}")
         print(f"   Answer: {result['answer'][:80]}...")
-    else:
-        print(f"   ✗ Failed: {result['error']}")
-    
-    # Example 3: Query with fallback
-    print("\n3. Query with Fallback:")
-    result = await query_with_fallback(
-        "What is quantum computing?",
-        fallback_answer="Quantum computing is a complex topic."
-    )
-    print(f"   Source: {result['source']}")
-    print(f"   Answer: {result['answer'][:80]}...")
-    
-    # Example 4: Validation before query
-    print("\n4. Validation Before Query:")
-    
-    # Valid query
-    result = await validate_and_query("What causes earthquakes?")
-    if result and result['success']:
-        print(f"   ✓ Valid query succeeded")
-    
-    # Invalid query (empty)
-    result = await validate_and_query("")
-    if result and not result['success']:
-        print(f"   ✗ Validation failed: {result['message']}")
-    
-    # Example 5: Batch with error handling
-    print("\n5. Batch Processing with Error Handling:")
-    queries = [
-        "What is photosynthesis?",
-        "Explain DNA structure",
-        "What is machine learning?"
-    ]
-    results = await batch_with_error_handling(queries)
+        
+        # Example 4: Validation before query
+        print("\n4. Validation Before Query:")
+        
+        # Valid query
+        result = await validate_and_query("What causes earthquakes?", client=client)
+        if result and result['success']:
+            print(f"   ✓ Valid query succeeded")
+        
+        # Invalid query (empty)
+        result = await validate_and_query("", client=client)
+        if result and not result['success']:
+            print(f"   ✗ Validation failed: {result['message']}")
+        
+        # Example 5: Batch with error handling
+        print("\n5. Batch Processing with Error Handling:")
+        queries = [
+            "What is photosynthesis?",
+            "Explain DNA structure",
+            "What is machine learning?"
+        ]
+        results = await batch_with_error_handling(queries, client=client)
     
     success_count = sum(1 for r in results if r['success'])
     print(f"\n   Summary:")
@@ -319,4 +382,11 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # uvloop is a faster drop-in event loop; fall back to asyncio where it
+    # isn't installed (it isn't available on Windows)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
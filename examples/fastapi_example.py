@@ -5,7 +5,7 @@ This example shows how to integrate BrainUs API with FastAPI.
 FastAPI is built for async operations.
 
 Requirements:
-    pip install fastapi uvicorn brainus-ai
+    pip install fastapi "uvicorn[standard]" brainus-ai orjson
 
 Usage:
     export BRAINUS_API_KEY=your_api_key
@@ -15,18 +15,44 @@ Usage:
     uvicorn fastapi_example:app --reload
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+import contextlib
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
 from typing import Optional, Dict, List
-from brainus_ai import BrainusAI, BrainusError
+from brainus_ai import BrainusAI, BrainusError, Citation
+import asyncio
+import itertools
+import orjson
 import os
+import sys
+import time
 from datetime import datetime
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the query log writer on startup and flush it on shutdown"""
+    app.state.log_queue = asyncio.Queue(maxsize=10_000)
+    writer = asyncio.create_task(write_query_log(app.state.log_queue))
+    yield
+    writer.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await writer
+    # Write whatever was still queued
+    lines = []
+    while not app.state.log_queue.empty():
+        lines.append(format_log_line(*app.state.log_queue.get_nowait()))
+    sys.stdout.writelines(lines)
+
+
 app = FastAPI(
     title="BrainUs Proxy API",
     description="FastAPI wrapper for BrainUs AI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS Configuration
@@ -60,6 +86,13 @@ class QueryResponse(BaseModel):
     has_citations: bool
 
 
+# Built once at import; dumps a whole citation list in a single call
+CITATIONS_ADAPTER = TypeAdapter(List[Citation])
+
+# Sequential IDs for logged queries (unique within this process)
+query_ids = itertools.count(1)
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -71,16 +104,12 @@ async def root():
 
 
 @app.post("/api/query", response_model=QueryResponse)
-async def query_endpoint(
-    request: QueryRequest, 
-    background_tasks: BackgroundTasks
-):
+async def query_endpoint(request: QueryRequest):
     """
     Query BrainUs AI
     
     Args:
         request: QueryRequest with query, store_id, and optional filters
-        background_tasks: FastAPI background tasks
         
     Returns:
         QueryResponse with answer, citations, and has_citations flag
@@ -96,19 +125,12 @@ async def query_endpoint(
                 filters=request.filters,
             )
 
-        # Log query in background
-        background_tasks.add_task(
-            log_query, 
-            request.query, 
-            f"query_{datetime.now().timestamp()}"
-        )
+        # Log query without blocking the request
+        log_query(request.query, f"query_{next(query_ids)}")
 
         return QueryResponse(
             answer=result.answer,
-            citations=[
-                c.model_dump() if hasattr(c, 'model_dump') else c.__dict__ 
-                for c in result.citations
-            ] if result.citations else [],
+            citations=CITATIONS_ADAPTER.dump_python(result.citations, mode="json"),
             has_citations=result.has_citations
         )
 
@@ -116,12 +138,66 @@ async def query_endpoint(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/api/query/stream")
+async def query_stream_endpoint(request: QueryRequest):
+    """
+    Query BrainUs AI and stream the result as Server-Sent Events
+    
+    Response headers go out immediately. The answer is sent as an
+    ``answer`` event as soon as it arrives, followed by one ``citation``
+    event per citation and a final ``done`` event, so the full payload is
+    never built in memory. The BrainUs API returns complete answers, so the
+    answer itself arrives as a single event.
+    
+    Args:
+        request: QueryRequest with query, store_id, and optional filters
+        
+    Returns:
+        StreamingResponse with ``text/event-stream`` content
+    """
+    async def events():
+        try:
+            async with BrainusAI(api_key=os.getenv("BRAINUS_API_KEY")) as client:
+                result = await client.query(
+                    query=request.query,
+                    store_id=request.store_id,
+                    filters=request.filters,
+                )
+        except BrainusError as e:
+            # Headers are already sent, so report errors in-band
+            yield sse_event("error", {"detail": str(e)})
+            return
+
+        yield sse_event("answer", {
+            "answer": result.answer,
+            "has_citations": result.has_citations
+        })
+        for citation in result.citations:
+            yield sse_event("citation", citation.model_dump(mode="json"))
+        yield sse_event("done", {})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def sse_event(event: str, data: dict) -> bytes:
+    """Encode a single Server-Sent Event"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+# (second, ISO timestamp) shared by every health probe within the same second
+health_timestamp = (0, "")
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    global health_timestamp
+    second = int(time.time())
+    if health_timestamp[0] != second:
+        health_timestamp = (second, datetime.fromtimestamp(second).isoformat())
     return {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": health_timestamp[1]
     }
 
 
@@ -129,9 +205,31 @@ def log_query(query: str, query_id: str):
     """
     Log query for analytics
     
-    This runs in the background after the response is sent
+    Only enqueues the entry; write_query_log does the actual output, so
+    the request path never waits on stdout. Entries are dropped if the
+    queue is full rather than slowing requests down.
+    """
+    with contextlib.suppress(asyncio.QueueFull):
+        app.state.log_queue.put_nowait((query, query_id))
+
+
+def format_log_line(query: str, query_id: str) -> str:
+    """Render one query log entry as an output line"""
+    return f"Query logged: {query_id} - {query[:50]}...\n"
+
+
+async def write_query_log(queue: asyncio.Queue, max_batch: int = 100):
+    """
+    Drain the query log queue, writing up to ``max_batch`` entries at a time
+    
+    The write runs in a worker thread so a slow stdout never stalls the
+    event loop.
     """
-    print(f"Query logged: {query_id} - {query[:50]}...")
+    while True:
+        lines = [format_log_line(*await queue.get())]
+        while len(lines) < max_batch and not queue.empty():
+            lines.append(format_log_line(*queue.get_nowait()))
+        await asyncio.to_thread(sys.stdout.writelines, lines)
 
 
 if __name__ == "__main__":
@@ -140,5 +238,8 @@ if __name__ == "__main__":
         app, 
         host="0.0.0.0", 
         port=8000,
-        log_level="info"
+        log_level="info",
+        # uvloop and httptools come with uvicorn[standard]
+        loop="uvloop",
+        http="httptools"
     )
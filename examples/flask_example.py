@@ -5,22 +5,69 @@ This example shows how to integrate BrainUs API with Flask.
 Flask 2.0+ supports async routes.
 
 Requirements:
-    pip install flask brainus-ai
+    pip install flask brainus-ai cachetools aiolimiter hypercorn orjson xxhash
 
 Usage:
     export BRAINUS_API_KEY=your_api_key
     python flask_example.py
+    # or: hypercorn flask_example:app --workers 1 --worker-class asyncio --bind 0.0.0.0:5000
 """
 
-from flask import Flask, request, jsonify
-from brainus_ai import BrainusAI, RateLimitError
+from flask import Flask, Response, request
+from aiolimiter import AsyncLimiter
+from brainus_ai import BrainusAI, Citation, RateLimitError
+import atexit
+import cachetools
+import functools
+import orjson
 import os
 import asyncio
+import random
+import sys
+import threading
+import xxhash
 
 app = Flask(__name__)
 
+# Query bodies are tiny; refuse anything bigger before reading it. Werkzeug
+# also enforces the config value for bodies without a Content-Length.
+MAX_BODY_BYTES = 8192
+app.config['MAX_CONTENT_LENGTH'] = MAX_BODY_BYTES
 
-async def query_with_retry(query, store_id="default", max_retries=3):
+# A missing key stops the app at startup rather than failing every request
+API_KEY = os.environ.get("BRAINUS_API_KEY") or sys.exit(
+    "Error: BRAINUS_API_KEY environment variable not set"
+)
+
+# Flask runs every async view in its own short-lived event loop, but the
+# client's connection pool belongs to the loop it is used on. Keep one
+# long-lived loop in a background thread that owns a single shared client,
+# so all requests reuse the same connections and TLS sessions.
+client_loop = asyncio.new_event_loop()
+threading.Thread(target=client_loop.run_forever, name="brainus-client", daemon=True).start()
+client = BrainusAI(api_key=API_KEY)
+
+
+async def run_on_client_loop(coro):
+    """Run a coroutine on the shared client's event loop and await its result"""
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, client_loop))
+
+
+# Pace outbound requests to the plan's rate limit so bursts queue here
+# (cheap) instead of bouncing off the API with 429s (expensive). Shared by
+# every request since it lives on client_loop.
+RATE_LIMIT_PER_MINUTE = int(os.getenv("BRAINUS_RATE_LIMIT_PER_MINUTE", "60"))
+limiter = AsyncLimiter(RATE_LIMIT_PER_MINUTE, 60)
+
+
+@atexit.register
+def close_client():
+    """Close the shared client's connections on shutdown"""
+    asyncio.run_coroutine_threadsafe(client.close(), client_loop).result(timeout=5)
+    client_loop.call_soon_threadsafe(client_loop.stop)
+
+
+async def query_with_retry(query, store_id="default", max_retries=3, max_wait=10, *, client):
     """
     Helper to retry on rate limit errors
     
@@ -28,21 +75,104 @@ async def query_with_retry(query, store_id="default", max_retries=3):
         query: The query string
         store_id: The store ID to query
         max_retries: Maximum number of retry attempts
+        max_wait: Maximum total seconds to spend sleeping between retries
+        client: Shared BrainusAI client (reuses its connection pool)
         
     Returns:
         QueryResult object
         
     Raises:
-        RateLimitError: If max retries exceeded
+        RateLimitError: If max retries or the wait budget would be exceeded
     """
-    async with BrainusAI(api_key=os.getenv("BRAINUS_API_KEY")) as client:
-        for attempt in range(max_retries):
-            try:
+    waited = 0
+    for attempt in range(max_retries):
+        try:
+            async with limiter:
                 return await client.query(query=query, store_id=store_id)
-            except RateLimitError as e:
-                if attempt == max_retries - 1:
-                    raise
-                await asyncio.sleep(e.retry_after)
+        except RateLimitError as e:
+            # Honour Retry-After up to a cap, else back off exponentially; the
+            # jitter keeps requests that were limited together from retrying
+            # together
+            delay = min(e.retry_after or 2 ** attempt, 30)
+            delay += random.uniform(0, 0.5 * delay)
+            # Give up now rather than hold the caller past its wait budget
+            if attempt == max_retries - 1 or waited + delay > max_wait:
+                raise
+            waited += delay
+            await asyncio.sleep(delay)
+
+
+def json_response(payload, status=200):
+    """Encode a JSON response with orjson, skipping jsonify's stdlib encoder"""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+
+# orjson fallback encoder for Citation models. Bound once to pydantic's
+# compiled serializer, skipping model_dump's per-call Python overhead.
+dump_citation = functools.partial(Citation.__pydantic_serializer__.to_python, mode='json')
+
+
+# Encoded responses for recent queries, and upstream fetches in flight keyed
+# the same way so concurrent misses for one query share a single API call.
+# Both are only used from client_loop, so access is never concurrent and
+# needs no lock.
+query_cache = cachetools.TTLCache(maxsize=1000, ttl=300)
+inflight: dict[str, asyncio.Task] = {}
+
+
+def cache_key(query, store_id):
+    """Cache key for a query, ignoring case and surrounding whitespace"""
+    # Encode the parts as a JSON array so no choice of query or store_id can
+    # collide with another pair (a plain "query|store_id" join could)
+    normalized = orjson.dumps([query.lower().strip(), store_id])
+    # Keys never leave the process, so a fast non-cryptographic hash is enough
+    return xxhash.xxh3_64_hexdigest(normalized)
+
+
+async def cached_query(query, store_id="default"):
+    """
+    Query through the in-process cache
+    
+    Repeated (query, store_id) pairs within the TTL are answered from
+    memory. The cached value is the encoded response body, so hits skip
+    serialization too. Identical queries that miss at the same time wait
+    on the first one's upstream call instead of making their own.
+    
+    Args:
+        query: The query string
+        store_id: The store ID to query
+        
+    Returns:
+        JSON bytes with answer, citations and has_citations
+    """
+    key = cache_key(query, store_id)
+    payload = query_cache.get(key)
+    if payload is not None:
+        return payload
+
+    task = inflight.get(key)
+    if task is None:
+        task = client_loop.create_task(fetch_payload(key, query, store_id))
+        inflight[key] = task
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+
+    # shield() so a cancelled request stops waiting without cancelling the
+    # fetch other requests are waiting on
+    return await asyncio.shield(task)
+
+
+async def fetch_payload(key, query, store_id):
+    """Query the API, then encode and cache the response body"""
+    result = await query_with_retry(query=query, store_id=store_id, client=client)
+    # orjson calls dump_citation as it reaches each citation, so only one
+    # citation's dict exists at a time instead of a list of all of them
+    payload = orjson.dumps({
+        'answer': result.answer,
+        'citations': result.citations,
+        'has_citations': result.has_citations
+    }, default=dump_citation)
+    query_cache[key] = payload
+    return payload
 
 
 @app.route('/api/query', methods=['POST'])
@@ -56,36 +186,57 @@ async def query():
         "store_id": "default"
     }
     """
-    data = request.json
+    # Reject bad requests before parsing large bodies or awaiting anything
+    if request.content_length and request.content_length > MAX_BODY_BYTES:
+        return json_response({'error': 'Payload too large'}, status=413)
+
+    data = request.get_json(silent=True, cache=False)
+    query_text = data.get('query') if isinstance(data, dict) else None
+
+    if not isinstance(query_text, str) or not query_text.strip():
+        return json_response({'error': 'Query is required'}, status=400)
 
-    if not data or 'query' not in data:
-        return jsonify({'error': 'Query is required'}), 400
+    store_id = data.get('store_id', 'default')
+    if not isinstance(store_id, str):
+        return json_response({'error': 'store_id must be a string'}, status=400)
 
     try:
-        result = await query_with_retry(
-            query=data['query'],
-            store_id=data.get('store_id', 'default')
-        )
-
-        return jsonify({
-            'answer': result.answer,
-            # Serialize citations using model_dump() if Pydantic, or dict comprehension
-            'citations': [
-                c.model_dump() if hasattr(c, 'model_dump') else c.__dict__ 
-                for c in result.citations
-            ] if result.citations else [],
-            'has_citations': result.has_citations
-        })
+        payload = await run_on_client_loop(cached_query(
+            query=query_text,
+            store_id=store_id
+        ))
+
+        return Response(payload, mimetype='application/json')
+
+    except RateLimitError as e:
+        # Still limited after retrying; tell the caller when to come back
+        response = json_response({'error': str(e)}, status=503)
+        if e.retry_after:
+            response.headers['Retry-After'] = str(e.retry_after)
+        return response
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, status=500)
+
+
+# Probes hit this constantly and the body never changes, so encode it once.
+# Each request still gets its own Response, since hooks may edit headers.
+HEALTH_BODY = orjson.dumps({'status': 'healthy'})
 
 
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({'status': 'healthy'})
+    return Response(HEALTH_BODY, mimetype='application/json')
 
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # Werkzeug's dev server handles one request at a time. Hypercorn serves
+    # the app from a thread pool so slow upstream queries overlap; keep a
+    # single worker so every request shares the one client above.
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = ['0.0.0.0:5000']
+    asyncio.run(serve(app, config, mode='wsgi'))
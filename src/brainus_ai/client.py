@@ -34,6 +34,8 @@ class BrainusAI:
         base_url: str = "https://api.brainus.lk",
         timeout: float = 30.0,
         max_retries: int = 3,
+        http2: bool = False,
+        limits: httpx.Limits | None = None,
     ) -> None:
         """
         Initialize the Brainus AI client.
@@ -43,6 +45,10 @@ class BrainusAI:
             base_url: Base URL for the API (default: production gateway)
             timeout: Request timeout in seconds
             max_retries: Maximum number of retry attempts for failed requests
+            http2: Enable HTTP/2 so concurrent requests share one connection
+                (requires the ``http2`` extra: ``pip install brainus-ai[http2]``)
+            limits: Connection pool limits (default: httpx defaults). Raise
+                these when running many queries concurrently.
         """
         if not api_key or not api_key.startswith("brainus_"):
             raise AuthenticationError("Invalid API key format. Expected format: brainus_...")
@@ -52,6 +58,11 @@ class BrainusAI:
         self.timeout = timeout
         self.max_retries = max_retries
 
+        if limits is not None:
+            transport = httpx.AsyncHTTPTransport(retries=max_retries, http2=http2, limits=limits)
+        else:
+            transport = httpx.AsyncHTTPTransport(retries=max_retries, http2=http2)
+
         self._client = httpx.AsyncClient(
             base_url=self.base_url,
             headers={
@@ -60,7 +71,7 @@ class BrainusAI:
                 "User-Agent": "brainus-ai-python/0.1.0",
             },
             timeout=httpx.Timeout(timeout),
-            transport=httpx.AsyncHTTPTransport(retries=max_retries),
+            transport=transport,
         )
 
     async def query(